@@ -1,9 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from app.core.config import settings
-from celery.result import AsyncResult
 from app.core.celery_app import celery_app
-from app.tasks.langchain_task import generate_openapi_spec_from_schemas
+from app.core.blob_store import get_json_blob
+from app.core.task_wait import poll_task_result
+from app.tasks.names import GENERATE_OPENAPI_SPEC_FROM_SCHEMAS
 
 router = APIRouter()
 
@@ -12,28 +14,45 @@ def queue_openapi_spec_task():
     """
     Queue a Celery task to generate an OpenAPI 3.1.1 specification from discovered schemas.
     """
-    task = generate_openapi_spec_from_schemas.apply_async()
+    task = celery_app.send_task(GENERATE_OPENAPI_SPEC_FROM_SCHEMAS)
     return {"task_id": task.id, "status": task.status, "type": None, "schema": None}
 
 @router.get("/datasource-schemas/result/{task_id}")
-def get_openapi_spec_result(task_id: str):
+async def get_openapi_spec_result(task_id: str, response: Response, wait: float = 0, include_schema: bool = True):
     """
     Get the result of the OpenAPI 3.1.1 spec generation Celery task.
+    The spec is stored by reference; it is resolved here and returned alongside its schema_ref
+    unless include_schema=false.
+    Pass ?wait=N to long-poll up to N seconds for the task's state to change.
     """
-    task_result = AsyncResult(task_id, app=celery_app)
-    result = task_result.result if task_result.successful() else None
+    status, result = await poll_task_result(task_id, GENERATE_OPENAPI_SPEC_FROM_SCHEMAS, response, wait)
 
-    if isinstance(result, dict) and "type" in result and "schema" in result:
+    if isinstance(result, dict) and "type" in result and ("schema_ref" in result or "schema" in result):
+        schema_ref = result.get("schema_ref")
+        schema = None
+        if include_schema:
+            schema = await run_in_threadpool(get_json_blob, schema_ref) if schema_ref else result.get("schema")
         return {
             "task_id": task_id,
-            "status": task_result.status,
+            "status": status,
             "type": result["type"],
-            "schema": result["schema"]
+            "schema": schema,
+            "schema_ref": schema_ref
         }
     else:
         return {
             "task_id": task_id,
-            "status": task_result.status,
+            "status": status,
             "type": None,
             "schema": None
         }
+
+@router.get("/datasource-schemas/spec/{schema_ref}")
+def get_openapi_spec_by_ref(schema_ref: str):
+    """
+    Fetch a stored OpenAPI spec by the schema_ref returned from the task endpoints.
+    """
+    spec = get_json_blob(schema_ref)
+    if spec is None:
+        return JSONResponse(status_code=404, content={"error": f"No OpenAPI spec stored for {schema_ref}"})
+    return spec
@@ -1,9 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from app.tasks.langchain_task import suggest_widgets_from_schemas
-from celery.result import AsyncResult
 from app.core.celery_app import celery_app
-import requests
+from app.core.admission import admit, release, retry_after, AdmissionRejected
+from app.core.blob_store import put_json_blob, get_json_blob, get_text_blob
+from app.core.task_stats import median_duration, remember_task_name
+from app.core.task_wait import poll_task_result
+from app.tasks.names import (
+    SUGGEST_WIDGETS_FROM_OPENAPI,
+    SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS,
+    GENERATE_WIDGETS_FROM_IDEAS,
+)
 
 router = APIRouter()
 
@@ -23,10 +30,13 @@ class TaskWidgetSuggestionResultResponse(BaseModel):
     task_id: str
     status: str
     schema_description: dict | None = None
+    schema_ref: str | None = None
     response: list[WidgetSuggestionResponse] | None = None
     datasources: list[str] | None = None
+    queue_position: int | None = None
 
 def fetch_schema_description():
+    import requests
     try:
         resp = requests.get("http://localhost:3001/api/datasource-schemas", timeout=10000)
         if resp.status_code == 200:
@@ -36,15 +46,41 @@ def fetch_schema_description():
     except Exception as e:
         return {"error": str(e)}
 
+def send_admitted_task(http_request: Request, task_name: str, args: list | None = None):
+    """
+    Enqueue a top-level job subject to admission control (per-tenant and global in-flight
+    limits, plus broker queue depth). Returns (task, queue_position).
+    Raises AdmissionRejected, which main.py turns into a 429 response.
+    """
+    import uuid
+    from app.core.config import settings
+
+    tenant = http_request.headers.get(settings.TENANT_HEADER) or (
+        http_request.client.host if http_request.client else "anonymous"
+    )
+    task_id = str(uuid.uuid4())
+    queue = celery_app.conf.task_routes[task_name]["queue"]
+    try:
+        queue_position = admit(task_id, tenant, queue)
+    except AdmissionRejected as e:
+        e.retry_after = retry_after(e, tenant, median_duration(task_name))
+        raise
+    try:
+        task = celery_app.send_task(task_name, args=args, task_id=task_id)
+    except Exception:
+        release(task_id)
+        raise
+    remember_task_name(task_id, task_name)
+    return task, queue_position
+
 @router.post("/widget-ideas", response_model=TaskWidgetSuggestionResultResponse)
-def queue_widget_suggestion_task(request: WidgetIdeasRequest):
+def queue_widget_suggestion_task(request: WidgetIdeasRequest, http_request: Request):
     """
     Queue a Celery task to suggest 3 widget ideas.
     If openapi_spec is provided, use it directly and skip the datasource-schemas Celery task.
     Otherwise, fetch the OpenAPI spec from /api/datasource-schemas as before.
     This endpoint is non-blocking and returns a task_id immediately.
     """
-    from app.tasks.langchain_task import suggest_widgets_from_datasource_schemas, suggest_widgets_from_openapi
     from app.core.config import settings
     import json
 
@@ -60,39 +96,52 @@ def queue_widget_suggestion_task(request: WidgetIdeasRequest):
                 response=None,
                 datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None)
             )
-        celery_task = suggest_widgets_from_openapi.apply_async(args=[openapi_dict])
+        # The spec is stored once and passed by reference, both to the task and back to
+        # the client; it can be fetched from /api/datasource-schemas/spec/{schema_ref}.
+        schema_ref = put_json_blob(openapi_dict)
+        celery_task, queue_position = send_admitted_task(http_request, SUGGEST_WIDGETS_FROM_OPENAPI, args=[schema_ref])
         return TaskWidgetSuggestionResultResponse(
             task_id=celery_task.id,
             status=celery_task.status,
-            schema_description=openapi_dict,
+            schema_ref=schema_ref,
             response=None,
-            datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None)
+            datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None),
+            queue_position=queue_position
         )
     else:
         # Fallback to end-to-end Celery task
-        task = suggest_widgets_from_datasource_schemas.apply_async()
+        task, queue_position = send_admitted_task(http_request, SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS)
         return TaskWidgetSuggestionResultResponse(
             task_id=task.id,
             status=task.status,
             schema_description=None,
             response=None,
-            datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None)
+            datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None),
+            queue_position=queue_position
         )
 
 @router.get("/widget-ideas/result/{task_id}", response_model=TaskWidgetSuggestionResultResponse)
-def get_widget_suggestion_result(task_id: str):
+async def get_widget_suggestion_result(task_id: str, response: Response, include_schema: bool = False, wait: float = 0):
     """
     Get the result of the widget suggestion Celery task.
+    The OpenAPI spec is stored by reference and only included when include_schema=true.
+    Pass ?wait=N to long-poll up to N seconds for the task's state to change.
     """
     from app.core.config import settings
-    task_result = AsyncResult(task_id, app=celery_app)
-    result = task_result.result if task_result.successful() else None
+    status, result = await poll_task_result(task_id, SUGGEST_WIDGETS_FROM_OPENAPI, response, wait)
 
     schema_description = None
+    schema_ref = None
     widget_results = None
 
     if isinstance(result, dict):
-        schema_description = result.get("schema_description")
+        schema_ref = result.get("schema_ref")
+        inline = result.get("schema_description")
+        # Only return the spec when asked; small error dicts are always passed through.
+        if include_schema:
+            schema_description = await run_in_threadpool(get_json_blob, schema_ref) if schema_ref else inline
+        elif isinstance(inline, dict) and "error" in inline:
+            schema_description = inline
         widget_results = result.get("response")
         # Convert widget_results to WidgetSuggestionResponse if possible
         if isinstance(widget_results, list):
@@ -103,8 +152,9 @@ def get_widget_suggestion_result(task_id: str):
 
     return TaskWidgetSuggestionResultResponse(
         task_id=task_id,
-        status=task_result.status,
+        status=status,
         schema_description=schema_description,
+        schema_ref=schema_ref,
         response=widget_results,
         datasources=getattr(settings, "DATASOURCES_API_ENDPOINTS", None)
     )
@@ -124,15 +174,18 @@ class GeneratedWidgetCode(BaseModel):
     widget_title: str
     widget_description: str
     code: str
+    code_hash: str | None = None
+    compiled: bool = False
+    compile_error: str | None = None
 
 @router.post("/generate-widgets")
-def generate_widgets(request: GenerateWidgetsRequest):
+def generate_widgets(request: GenerateWidgetsRequest, http_request: Request):
     """
     Queue a Celery task to generate React widget code for each widget idea.
-    Returns a task_id immediately.
+    Returns a task_id and the number of jobs ahead of it immediately,
+    or 429 when the tenant, global or queue-depth limit is reached.
     """
     import json
-    from app.tasks.langchain_task import generate_widgets_from_ideas
 
     if request.openapi_spec:
         try:
@@ -142,21 +195,40 @@ def generate_widgets(request: GenerateWidgetsRequest):
                 status_code=400,
                 content={"error": f"Invalid OpenAPI JSON: {str(e)}"}
             )
-        celery_task = generate_widgets_from_ideas.apply_async(args=[openapi_dict])
+        celery_task, queue_position = send_admitted_task(
+            http_request, GENERATE_WIDGETS_FROM_IDEAS, args=[put_json_blob(openapi_dict)]
+        )
     else:
-        celery_task = generate_widgets_from_ideas.apply_async(args=[None])
+        celery_task, queue_position = send_admitted_task(http_request, GENERATE_WIDGETS_FROM_IDEAS, args=[None])
 
-    return {"task_id": celery_task.id, "status": celery_task.status}
+    return {"task_id": celery_task.id, "status": celery_task.status, "queue_position": queue_position}
 
 @router.get("/generate-widgets/result/{task_id}")
-def get_generate_widgets_result(task_id: str):
+async def get_generate_widgets_result(task_id: str, response: Response, wait: float = 0):
     """
     Get the result of the widget code generation Celery task.
+    Pass ?wait=N to long-poll up to N seconds for the task's state to change.
     """
-    task_result = AsyncResult(task_id, app=celery_app)
-    result = task_result.result if task_result.successful() else None
+    status, result = await poll_task_result(task_id, GENERATE_WIDGETS_FROM_IDEAS, response, wait)
     return {
         "task_id": task_id,
-        "status": task_result.status,
+        "status": status,
         "result": result
     }
+
+@router.get("/generate-widgets/compiled/{code_hash}")
+def get_compiled_widget(code_hash: str):
+    """
+    Serve the server-side transpiled JS for a generated widget whose result has compiled=true.
+    The content is keyed by its hash, so clients may cache it for as long as it is stored.
+    """
+    from app.core.config import settings
+
+    compiled = get_text_blob(code_hash)
+    if compiled is None:
+        return JSONResponse(status_code=404, content={"error": f"No compiled widget stored for {code_hash}"})
+    return Response(
+        content=compiled,
+        media_type="application/javascript",
+        headers={"Cache-Control": f"public, max-age={settings.BLOB_EXPIRES}, immutable"},
+    )
@@ -1,8 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
-from app.tasks.langchain_task import run_langchain
-from celery.result import AsyncResult
+from app.tasks.names import RUN_LANGCHAIN
 from app.core.celery_app import celery_app
+from app.core.task_wait import poll_task_result
 
 router = APIRouter()
 
@@ -17,15 +17,14 @@ class TaskResultResponse(BaseModel):
 
 @router.post("/langchain/add", response_model=TaskResultResponse)
 def queue_langchain_add_task(request: LangChainAddRequest):
-    task = run_langchain.apply_async(args=[request.num1, request.num2])
+    task = celery_app.send_task(RUN_LANGCHAIN, args=[request.num1, request.num2])
     return TaskResultResponse(task_id=task.id, status=task.status, result=None)
 
 @router.get("/langchain/result/{task_id}", response_model=TaskResultResponse)
-def get_langchain_result(task_id: str):
-    task_result = AsyncResult(task_id, app=celery_app)
-    result = task_result.result if task_result.successful() else None
+async def get_langchain_result(task_id: str, response: Response, wait: float = 0):
+    status, result = await poll_task_result(task_id, RUN_LANGCHAIN, response, wait)
     return TaskResultResponse(
         task_id=task_id,
-        status=task_result.status,
+        status=status,
         result=result
     )
@@ -0,0 +1,135 @@
+import time
+
+import redis
+from celery.signals import task_postrun
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+# Admission control for top-level generation jobs. In-flight jobs are tracked in Redis
+# sorted sets (globally and per tenant, scored by admission time); workers release a
+# job's slot when its task finishes. Entries older than ADMISSION_JOB_TTL are pruned so
+# slots held by crashed workers are eventually reclaimed.
+
+_GLOBAL_KEY = "widget-factory:inflight"
+
+_ADMIT_SCRIPT = """
+local cutoff = tonumber(ARGV[1]) - tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', cutoff)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', cutoff)
+local in_flight = redis.call('ZCARD', KEYS[1])
+local tenant_in_flight = redis.call('ZCARD', KEYS[2])
+if tenant_in_flight >= tonumber(ARGV[4]) then
+    return {0, 'tenant', tenant_in_flight}
+end
+if in_flight >= tonumber(ARGV[3]) then
+    return {0, 'global', in_flight}
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[1], ARGV[5])
+redis.call('SET', KEYS[3], ARGV[6], 'EX', ARGV[2])
+return {1, 'ok', in_flight}
+"""
+
+
+def _redis():
+    return redis_client(settings.CELERY_BROKER_URL)
+
+
+def _tenant_key(tenant: str) -> str:
+    return f"widget-factory:inflight:tenant:{tenant}"
+
+
+def _owner_key(task_id: str) -> str:
+    return f"widget-factory:inflight:owner:{task_id}"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a job would exceed a tenant, global or queue-depth limit."""
+
+    def __init__(self, scope: str, in_flight: int, limit: int):
+        self.scope = scope
+        self.in_flight = in_flight
+        self.limit = limit
+        super().__init__(f"Too many in-flight jobs ({scope}): {in_flight} >= {limit}")
+
+    @property
+    def queue_position(self) -> int:
+        """Jobs ahead of this request that must finish before a slot frees up."""
+        return self.in_flight - self.limit + 1
+
+
+def queue_depth(queue: str) -> int:
+    """Number of messages waiting in a Celery queue on the Redis broker."""
+    return _redis().llen(queue)
+
+
+def admit(task_id: str, tenant: str, queue: str) -> int:
+    """
+    Reserve an in-flight slot for task_id before it is enqueued.
+    Returns its queue position: the number of messages already waiting in the target queue.
+    Raises AdmissionRejected when the queue is backed up or a limit is reached.
+    """
+    depth = queue_depth(queue)
+    if depth >= settings.ADMISSION_MAX_QUEUE_DEPTH:
+        raise AdmissionRejected("queue", depth, settings.ADMISSION_MAX_QUEUE_DEPTH)
+
+    admitted, scope, in_flight = _redis().eval(
+        _ADMIT_SCRIPT,
+        3,
+        _GLOBAL_KEY,
+        _tenant_key(tenant),
+        _owner_key(task_id),
+        time.time(),
+        settings.ADMISSION_JOB_TTL,
+        settings.ADMISSION_MAX_INFLIGHT,
+        settings.ADMISSION_MAX_INFLIGHT_PER_TENANT,
+        task_id,
+        tenant,
+    )
+    if not admitted:
+        scope = scope.decode() if isinstance(scope, bytes) else scope
+        limit = settings.ADMISSION_MAX_INFLIGHT_PER_TENANT if scope == "tenant" else settings.ADMISSION_MAX_INFLIGHT
+        raise AdmissionRejected(scope, in_flight, limit)
+    return depth
+
+
+def release(task_id: str) -> None:
+    """Free the in-flight slot held by task_id, if it was admitted."""
+    client = _redis()
+    tenant = client.get(_owner_key(task_id))
+    pipe = client.pipeline()
+    pipe.zrem(_GLOBAL_KEY, task_id)
+    if tenant is not None:
+        pipe.zrem(_tenant_key(tenant.decode()), task_id)
+        pipe.delete(_owner_key(task_id))
+    pipe.execute()
+
+
+def retry_after(rejection: AdmissionRejected, tenant: str, job_duration: float | None) -> int:
+    """
+    Seconds a rejected client should wait before resubmitting, given the job's median
+    duration. A backed-up queue needs its waiting jobs drained (depth x job_duration); an
+    in-flight limit needs the oldest slot in the tenant's or global set to finish.
+    """
+    if job_duration is None:
+        return settings.RETRY_AFTER_DEFAULT
+    if rejection.scope == "queue":
+        wait = rejection.in_flight * job_duration
+    else:
+        key = _tenant_key(tenant) if rejection.scope == "tenant" else _GLOBAL_KEY
+        try:
+            oldest = _redis().zrange(key, 0, 0, withscores=True)
+        except redis.RedisError:
+            oldest = []
+        age = time.time() - oldest[0][1] if oldest else 0
+        wait = job_duration - age
+    return int(min(max(wait, 1), settings.ADMISSION_RETRY_AFTER_MAX))
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, **kwargs):
+    try:
+        release(task_id)
+    except redis.RedisError:
+        pass
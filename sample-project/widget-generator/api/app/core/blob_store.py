@@ -0,0 +1,54 @@
+import gzip
+import hashlib
+import json
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+def _redis():
+    return redis_client(settings.BLOB_STORE_URL or settings.CELERY_RESULT_BACKEND)
+
+
+def _key(ref: str) -> str:
+    return f"widget-factory:blob:{ref}"
+
+
+def put_json_blob(obj) -> str:
+    """
+    Store a large JSON-serializable object (e.g. an OpenAPI spec) once, gzip-compressed,
+    and return its content hash. Task results carry this reference instead of the blob.
+    """
+    payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    ref = hashlib.sha256(payload).hexdigest()
+    # Identical specs share one entry; re-putting only refreshes the expiry.
+    _redis().set(_key(ref), gzip.compress(payload), ex=settings.BLOB_EXPIRES)
+    return ref
+
+
+def get_json_blob(ref: str | None):
+    """Fetch an object stored with put_json_blob, or None if it is missing or expired."""
+    if not ref:
+        return None
+    data = _redis().get(_key(ref))
+    if data is None:
+        return None
+    return json.loads(gzip.decompress(data))
+
+
+def put_text_blob(ref: str, text: str) -> None:
+    """
+    Store a large text artifact (e.g. compiled widget JS) under a caller-chosen content key,
+    gzip-compressed and expiring after BLOB_EXPIRES.
+    """
+    _redis().set(_key(ref), gzip.compress(text.encode("utf-8")), ex=settings.BLOB_EXPIRES)
+
+
+def get_text_blob(ref: str | None) -> str | None:
+    """Fetch text stored with put_text_blob, or None if it is missing or expired."""
+    if not ref:
+        return None
+    data = _redis().get(_key(ref))
+    if data is None:
+        return None
+    return gzip.decompress(data).decode("utf-8")
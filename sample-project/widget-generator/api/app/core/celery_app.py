@@ -1,11 +1,88 @@
 from celery import Celery
+from kombu import compression, serialization
+from kombu.utils.json import dumps as json_dumps, loads as json_loads
 from app.core.config import settings
+from app.tasks import names
 
 celery_app = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
 )
-celery_app.conf.task_routes = {"app.tasks.*": {"queue": "default"}}
+celery_app.conf.task_routes = {
+    names.RUN_LANGCHAIN: {"queue": "default"},
+    names.GENERATE_OPENAPI_SPEC_FROM_SCHEMAS: {"queue": "spec"},
+    names.SUGGEST_WIDGETS_FROM_OPENAPI: {"queue": "ideas"},
+    names.SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS: {"queue": "ideas"},
+    names.SUGGEST_WIDGETS_FROM_SCHEMAS: {"queue": "ideas"},
+    names.GENERATE_WIDGETS_FROM_IDEAS: {"queue": "widgets"},
+}
 
-import app.tasks.langchain_task
+def _register_compressed_json(method: str) -> str:
+    """
+    Register a JSON serializer whose payload is compressed with a kombu compression method
+    ("gzip", "bzip2", "zstd", ...) and return its name. The result backends ignore
+    result_compression, so results are compressed by serializing them this way instead.
+    """
+    name = f"json+{method}"
+    _, content_type = compression.get_encoder(method)
+    serialization.register(
+        name,
+        lambda obj: compression.compress(json_dumps(obj), content_type)[0],
+        lambda data: json_loads(compression.decompress(data, content_type)),
+        content_type=f"application/x-json+{method}",
+        content_encoding="binary",
+    )
+    return name
+
+
+_result_serializer = (
+    _register_compressed_json(settings.CELERY_RESULT_COMPRESSION)
+    if settings.CELERY_RESULT_COMPRESSION
+    else "json"
+)
+
+# Results embed full widget code; compress them in the result backend and expire them
+# so Redis memory stays bounded. Large blobs such as OpenAPI specs are stored by
+# reference via app.core.blob_store rather than inline.
+celery_app.conf.update(
+    result_serializer=_result_serializer,
+    result_accept_content=[_result_serializer],
+    task_compression=settings.CELERY_TASK_COMPRESSION or None,
+    result_expires=settings.CELERY_RESULT_EXPIRES,
+    # Publish a STARTED state so long-polling clients are woken when work begins.
+    task_track_started=True,
+)
+
+# Worker profiles: which queues a worker consumes and the task modules it needs to load.
+# The API process never imports task modules; it enqueues by name with send_task.
+WORKER_PROFILES = {
+    "all": {
+        "queues": ["default", "spec", "ideas", "widgets"],
+        "include": [
+            "app.tasks.langchain_task",
+            "app.tasks.spec_task",
+            "app.tasks.idea_task",
+            "app.tasks.widget_task",
+        ],
+    },
+    "default": {"queues": ["default"], "include": ["app.tasks.langchain_task"]},
+    "spec": {"queues": ["spec"], "include": ["app.tasks.spec_task"]},
+    "ideas": {"queues": ["ideas"], "include": ["app.tasks.idea_task"]},
+    "widgets": {"queues": ["widgets"], "include": ["app.tasks.widget_task"]},
+}
+
+def configure_worker_profile(profile: str) -> list[str]:
+    """
+    Restrict the task modules loaded at worker startup to those the profile needs.
+    Returns the list of queues the worker should consume.
+    """
+    if profile not in WORKER_PROFILES:
+        raise ValueError(f"Unknown worker profile '{profile}'. Choose from: {', '.join(WORKER_PROFILES)}")
+    celery_app.conf.include = WORKER_PROFILES[profile]["include"]
+    return WORKER_PROFILES[profile]["queues"]
+
+# Record per-stage task durations for Retry-After hints
+import app.core.task_stats
+# Release admission-control slots when jobs finish
+import app.core.admission
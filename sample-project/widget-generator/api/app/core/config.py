@@ -9,10 +9,60 @@ import json
 class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    CELERY_WORKER_PROFILE: str = "all"
+    CELERY_RESULT_COMPRESSION: str = "gzip"
+    CELERY_TASK_COMPRESSION: str = "gzip"
+    CELERY_RESULT_EXPIRES: int = 86400
+    BLOB_STORE_URL: str | None = None
+    BLOB_EXPIRES: int = 86400
     OPENAI_API_KEY: str
     DATASOURCES_API_ENDPOINTS: list[str] = []
     DATASOURCE_AUTH_HEADERS: dict = {}
     WIDGET_GENERATION_COUNT: int = 3
+    # LLM routing: endpoint name -> {model, base_url?, api_key?, max_tokens?, timeout?}
+    LLM_ENDPOINTS: dict = {
+        "gpt-4.1": {"model": "gpt-4.1"},
+        "gpt-4.1-mini": {"model": "gpt-4.1-mini"},
+    }
+    # Tier -> endpoints in order of preference; later entries are failover targets
+    LLM_TIERS: dict = {
+        "strong": ["gpt-4.1", "gpt-4.1-mini"],
+        "fast": ["gpt-4.1-mini", "gpt-4.1"],
+    }
+    # Pipeline stage -> tier
+    LLM_STAGE_TIERS: dict = {
+        "sample": "fast",
+        "spec": "strong",
+        "ideas": "fast",
+        "code": "strong",
+    }
+    LLM_DEFAULT_TIER: str = "strong"
+    # Pipeline stage -> median latency (seconds) above which an endpoint is demoted
+    LLM_STAGE_LATENCY_BUDGET: dict = {}
+    LLM_MAX_TOKENS: int = 20000
+    LLM_TIMEOUT: float = 180
+    # Retries on the same endpoint for rate limits / transient 5xx before failing over
+    LLM_MAX_RETRIES: int = 1
+    LLM_RETRY_BACKOFF: float = 2
+    LLM_STATS_WINDOW: int = 20
+    LLM_ERROR_RATE_THRESHOLD: float = 0.5
+    LLM_FAILURES_BEFORE_COOLDOWN: int = 3
+    LLM_COOLDOWN: float = 60
+    LONG_POLL_MAX_WAIT: float = 60
+    STAGE_DURATION_SAMPLES: int = 50
+    RETRY_AFTER_DEFAULT: int = 5
+    RETRY_AFTER_MAX: int = 30
+    ADMISSION_MAX_INFLIGHT: int = 20
+    ADMISSION_MAX_INFLIGHT_PER_TENANT: int = 3
+    ADMISSION_MAX_QUEUE_DEPTH: int = 50
+    ADMISSION_JOB_TTL: int = 3600
+    ADMISSION_RETRY_AFTER_MAX: int = 600
+    TENANT_HEADER: str = "X-Tenant-ID"
+    WIDGET_CODEGEN_CONCURRENCY: int = 4
+    WIDGET_COMPILER_BIN: str = "esbuild"
+    WIDGET_COMPILER_CONCURRENCY: int = 4
+    WIDGET_COMPILER_TIMEOUT: int = 30
+    WIDGET_CODE_MAX_ATTEMPTS: int = 3
 
     def __init__(self, **values):
         super().__init__(**values)
@@ -0,0 +1,26 @@
+import threading
+
+import redis
+import redis.asyncio as aioredis
+
+# One client (and so one connection pool) per Redis URL per process, shared by every module
+# that talks to Redis directly. The broker, result backend and blob store usually share a URL.
+_clients: dict[str, redis.Redis] = {}
+_async_clients: dict[str, aioredis.Redis] = {}
+_lock = threading.Lock()
+
+
+def redis_client(url: str) -> redis.Redis:
+    """Return the process-wide sync Redis client for url."""
+    with _lock:
+        if url not in _clients:
+            _clients[url] = redis.Redis.from_url(url)
+        return _clients[url]
+
+
+def async_redis_client(url: str) -> aioredis.Redis:
+    """Return the process-wide asyncio Redis client for url."""
+    with _lock:
+        if url not in _async_clients:
+            _async_clients[url] = aioredis.Redis.from_url(url)
+        return _async_clients[url]
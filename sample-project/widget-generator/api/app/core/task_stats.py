@@ -0,0 +1,81 @@
+import statistics
+import time
+
+import redis
+from celery.signals import task_prerun, task_postrun
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+# Rolling record of how long each task (pipeline stage) takes, written by workers
+# and read by the API to suggest Retry-After intervals to polling clients.
+_started = {}
+
+
+def _redis():
+    return redis_client(settings.CELERY_RESULT_BACKEND)
+
+
+def _key(task_name: str) -> str:
+    return f"widget-factory:durations:{task_name}"
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    _started[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is None or task is None or state != "SUCCESS":
+        return
+    try:
+        pipe = _redis().pipeline()
+        pipe.lpush(_key(task.name), time.monotonic() - started)
+        pipe.ltrim(_key(task.name), 0, settings.STAGE_DURATION_SAMPLES - 1)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def remember_task_name(task_id: str, task_name: str) -> None:
+    """
+    Record which task a task_id belongs to, for endpoints that serve several task types.
+    (result_extended would store this too, but it also copies every task's args and
+    kwargs into the result backend.)
+    """
+    try:
+        _redis().set(f"widget-factory:task-name:{task_id}", task_name, ex=settings.CELERY_RESULT_EXPIRES)
+    except redis.RedisError:
+        pass
+
+
+def task_name_for(task_id: str, default: str) -> str:
+    """The task name recorded by remember_task_name, or default if none was recorded."""
+    try:
+        name = _redis().get(f"widget-factory:task-name:{task_id}")
+    except redis.RedisError:
+        name = None
+    return name.decode() if name else default
+
+
+def median_duration(task_name: str) -> float | None:
+    """Median observed duration of a task in seconds, or None if there are no samples yet."""
+    try:
+        samples = [float(s) for s in _redis().lrange(_key(task_name), 0, -1)]
+    except redis.RedisError:
+        samples = []
+    return statistics.median(samples) if samples else None
+
+
+def retry_after_hint(task_name: str) -> int:
+    """
+    Suggest how many seconds a client should wait before polling a pending task again:
+    a fraction of the task's median observed duration, clamped to a sane range.
+    """
+    duration = median_duration(task_name)
+    if duration is None:
+        return settings.RETRY_AFTER_DEFAULT
+    hint = duration / 4
+    return int(min(max(hint, 1), settings.RETRY_AFTER_MAX))
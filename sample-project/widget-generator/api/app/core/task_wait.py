@@ -0,0 +1,68 @@
+import asyncio
+
+from celery import states
+from celery.result import AsyncResult
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+from app.core.task_stats import retry_after_hint, task_name_for
+
+
+def _redis():
+    return async_redis_client(settings.CELERY_RESULT_BACKEND)
+
+
+async def wait_for_task_update(task_id: str, wait: float) -> None:
+    """
+    Long-poll helper: block (without holding a worker thread) until the task's state changes
+    or `wait` seconds pass. The Redis result backend publishes on the task's meta key
+    whenever it stores a new state, so we subscribe to that channel instead of polling.
+    """
+    wait = min(max(wait, 0), settings.LONG_POLL_MAX_WAIT)
+    if wait <= 0:
+        return
+
+    channel = celery_app.backend.get_key_for_task(task_id)
+    pubsub = _redis().pubsub()
+    try:
+        # Subscribe before reading the state so an update between the two is not missed
+        await pubsub.subscribe(channel)
+        initial_state = await run_in_threadpool(lambda: AsyncResult(task_id, app=celery_app).state)
+        if initial_state in states.READY_STATES:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while (remaining := deadline - loop.time()) > 0:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None:
+                return
+    finally:
+        await pubsub.unsubscribe(channel)
+        await pubsub.aclose()
+
+
+async def poll_task_result(task_id: str, task_name: str, response: Response, wait: float = 0):
+    """
+    Shared body of the /result endpoints. Optionally long-polls for `wait` seconds, then
+    returns (status, result) where result is None unless the task succeeded. While the task
+    is still running a Retry-After header is set from the stage's observed durations;
+    task_name is the fallback when no name was recorded for task_id at enqueue time.
+    """
+    await wait_for_task_update(task_id, wait)
+
+    def _read():
+        task_result = AsyncResult(task_id, app=celery_app)
+        status = task_result.status
+        result = task_result.result if status == states.SUCCESS else None
+        retry_after = None
+        if status not in states.READY_STATES:
+            retry_after = retry_after_hint(task_name_for(task_id, task_name))
+        return status, result, retry_after
+
+    status, result, retry_after = await run_in_threadpool(_read)
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return status, result
@@ -0,0 +1,239 @@
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.blob_store import get_json_blob
+from app.tasks.names import (
+    SUGGEST_WIDGETS_FROM_OPENAPI,
+    SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS,
+    SUGGEST_WIDGETS_FROM_SCHEMAS,
+)
+from app.tasks.llm_router import invoke_llm
+from langchain_core.messages import HumanMessage
+import requests
+import json
+
+# Celery task to generate widget ideas from OpenAPI spec
+@celery_app.task(name=SUGGEST_WIDGETS_FROM_OPENAPI)
+def suggest_widgets_from_openapi(schema_ref: str) -> list:
+    """
+    Suggest N widget ideas for the OpenAPI spec stored under schema_ref (see app.core.blob_store).
+    The spec travels by reference so broker messages stay small.
+    """
+    openapi_spec = get_json_blob(schema_ref)
+    if openapi_spec is None:
+        return [{"error": f"No OpenAPI spec stored for {schema_ref}"}]
+    return widget_ideas_from_openapi(openapi_spec)
+
+def widget_ideas_from_openapi(openapi_spec: dict) -> list:
+    """
+    Feed an OpenAPI 3.1.1 specification to the LLM and suggest N widget ideas.
+    Returns a list of dicts with widget_title, widget_description, endpoint, and data_combination.
+    """
+    openapi_str = json.dumps(openapi_spec, indent=2)
+    count = settings.WIDGET_GENERATION_COUNT
+    prompt = (
+        "You are an expert dashboard widget designer and frontend engineer. "
+        "You are given an OpenAPI 3.1.1 specification describing a set of API endpoints. "
+        f"Your task is to suggest {count} highly complete, general-purpose widget ideas that could be built using these endpoints. "
+        "Each widget should use as much of the available data as possible, maximizing completeness and usability. "
+        "Each widget must be standalone: do not require any unimported datasources or endpoints, and use only what is fetched from the provided endpoints. "
+        "The widget_description should be comprehensive, containing all relevant details about the widget's purpose and functionality. "
+        "For each idea, output a JSON object with the following fields:\n"
+        "- widget_title: (string) a short, descriptive title for the widget\n"
+        "- widget_description: (string) a comprehensive, detailed description of what the widget does and how it is useful\n"
+        "- endpoint: (string) the API endpoint(s) used\n"
+        "- data_combination: (string) a highly detailed, step-by-step explanation of exactly what data fields (including all relevant nested JSON fields) to fetch and combine from which endpoint(s), with clear instructions for a frontend developer. The data_combination must fetch all relevant data from the specified endpoint(s) as appropriate, and sort or organize the data so that the widget is meaningful and useful for the end user. Be explicit about how to process, filter, and sort the data for the widget's purpose.\n"
+        "- react_fetch_example: (string) a copy-paste ready React fetch code snippet (no imports, just the fetch logic and data extraction) that demonstrates exactly how to fetch and combine the data for this widget, with comments explaining each step and referencing all relevant nested fields. If the schema or sample is incomplete, make reasonable assumptions and still provide a complete, detailed example.\n"
+        "Guardrails:\n"
+        f"- Output exactly {count} ideas as a JSON array of objects.\n"
+        "- All fields must be strings. If you are unsure, use an empty string.\n"
+        "- Do NOT include any explanation, commentary, or markdown—output ONLY the JSON array.\n"
+        f"- Validate your output: ensure the result is a valid JSON array of {count} objects, each with the required fields and correct types.\n"
+        f"OpenAPI 3.1.1 specification:\n{openapi_str}\n"
+        "Respond ONLY with the JSON array."
+    )
+
+    result = invoke_llm("ideas", [HumanMessage(content=prompt)], temperature=0.3)
+
+    # Try to parse the LLM's response as JSON
+    try:
+        ideas = json.loads(result)
+        # Validate structure: ensure each idea has required fields and there are exactly count
+        if not isinstance(ideas, list) or len(ideas) != count:
+            return [{"error": f"LLM did not return exactly {count} widget ideas", "raw_response": result}]
+        validated = []
+        for idea in ideas:
+            validated.append({
+                "widget_title": idea.get("widget_title", ""),
+                "widget_description": idea.get("widget_description", ""),
+                "endpoint": idea.get("endpoint", ""),
+                "data_combination": idea.get("data_combination", "")
+            })
+        return validated
+    except Exception as e:
+        # Return error in result
+        return [{"error": f"Failed to parse LLM response as JSON: {str(e)}", "raw_response": result}]
+
+# Celery task to generate widget ideas from datasource schemas (end-to-end)
+@celery_app.task(name=SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS)
+def suggest_widgets_from_datasource_schemas() -> dict:
+    """
+    End-to-end Celery task: triggers OpenAPI spec generation, polls for result, then generates widget ideas.
+    Returns a dict with schema_ref (content hash of the stored OpenAPI spec) and response
+    (list of widget ideas), or schema_description holding an error.
+    """
+    import time
+    import requests
+
+    # Step 1: Trigger OpenAPI spec generation
+    try:
+        resp = requests.post("http://localhost:3001/api/datasource-schemas", timeout=10)
+        if resp.status_code != 200:
+            return {
+                "schema_description": {"error": f"Failed to start OpenAPI spec generation: status {resp.status_code}"},
+                "response": None
+            }
+        data = resp.json()
+        task_id = data.get("task_id")
+        if not task_id:
+            return {
+                "schema_description": {"error": "No task_id returned from /api/datasource-schemas"},
+                "response": None
+            }
+    except Exception as e:
+        return {
+            "schema_description": {"error": f"Exception during OpenAPI spec generation: {str(e)}"},
+            "response": None
+        }
+
+    # Step 2: Long-poll for result; only the spec's schema_ref is fetched, not the spec itself
+    wait = 30  # seconds per long-poll request
+    result_url = f"http://localhost:3001/api/datasource-schemas/result/{task_id}?wait={wait}&include_schema=false"
+    deadline = time.monotonic() + 3600  # up to 1 hour total
+    delay = 3  # seconds to back off after a failed poll request
+    schema_ref = None
+    while time.monotonic() < deadline:
+        try:
+            result_resp = requests.get(result_url, timeout=wait + 10)
+            result_data = result_resp.json() if result_resp.status_code == 200 else None
+        except Exception:
+            result_data = None
+        if result_data is None:
+            time.sleep(delay)
+            continue
+        status = result_data.get("status")
+        if status == "SUCCESS" and result_data.get("schema_ref"):
+            schema_ref = result_data["schema_ref"]
+            break
+        # A finished task without a spec will never produce one; stop polling
+        if status in ("SUCCESS", "FAILURE", "REVOKED"):
+            return {
+                "schema_description": {"error": f"OpenAPI spec generation finished with status {status} and no spec"},
+                "response": None
+            }
+        # Still pending or just started: the server already waited, so long-poll again right away
+    else:
+        return {
+            "schema_description": {"error": "Timeout waiting for OpenAPI spec generation (1 hour)"},
+            "response": None
+        }
+
+    # Step 3: Generate widget ideas from the stored spec
+    openapi_dict = get_json_blob(schema_ref)
+    if openapi_dict is None:
+        return {
+            "schema_description": {"error": f"No OpenAPI spec stored for {schema_ref}"},
+            "response": None
+        }
+    widget_ideas = widget_ideas_from_openapi(openapi_dict)
+    return {
+        "schema_ref": schema_ref,
+        "response": widget_ideas
+    }
+
+# main celery task for widget suggestions (legacy, to be removed)
+@celery_app.task(name=SUGGEST_WIDGETS_FROM_SCHEMAS)
+def suggest_widgets_from_schemas() -> list:
+    """
+    Fetch schemas from all datasources, feed to LLM, and suggest N widget ideas.
+    Returns a list of dicts with widget_title, widget_description, endpoint, and data_combination.
+    """
+    endpoints = settings.DATASOURCES_API_ENDPOINTS
+    schemas = {}
+    count = settings.WIDGET_GENERATION_COUNT
+
+    # Fetch schemas synchronously
+    for url in endpoints:
+        try:
+            # Try OpenAPI/Swagger first
+            for schema_path in ["/openapi.json", "/swagger.json"]:
+                schema_url = url.rstrip("/") + schema_path
+                resp = requests.get(schema_url, timeout=10)
+                if resp.status_code == 200 and resp.headers.get("content-type", "").startswith("application/json"):
+                    schemas[url] = {"type": "openapi/swagger", "schema": resp.json()}
+                    break
+            else:
+                # Fallback: try to infer schema from sample JSON
+                resp = requests.get(url, timeout=10)
+                if resp.status_code == 200 and resp.headers.get("content-type", "").startswith("application/json"):
+                    try:
+                        data = resp.json()
+                        if isinstance(data, list) and data:
+                            sample = data[0]
+                        elif isinstance(data, dict):
+                            sample = data
+                        else:
+                            sample = data
+                        schemas[url] = {"type": "inferred", "sample": sample}
+                    except Exception as e:
+                        schemas[url] = {"error": f"Failed to parse JSON: {str(e)}"}
+                else:
+                    schemas[url] = {"error": f"No schema found and endpoint did not return JSON (status {resp.status_code})"}
+        except Exception as e:
+            schemas[url] = {"error": str(e)}
+
+    # Build prompt for LLM
+    schemas_str = json.dumps(schemas, indent=2)
+    prompt = (
+        "You are an expert dashboard widget designer and frontend engineer. "
+        "You are given a list of datasource endpoints, each with a JSON schema and a sample data entry. "
+        f"Your task is to suggest {count} highly complete, general-purpose widget ideas that could be built using these datasources. "
+        "Each widget should use as much of the available data as possible, maximizing completeness and usability. "
+        "Each widget must be standalone: do not require any unimported datasources or endpoints, and use only what is fetched from the provided endpoints. "
+        "The widget_description should be comprehensive, containing all relevant details about the widget's purpose and functionality. "
+        "Use the schema to understand the general structure and possible data, and use the sample entry ONLY as a reference for output formatting—not for restricting your ideas to the sample's values. "
+        "For each idea, output a JSON object with the following fields:\n"
+        "- widget_title: (string) a short, descriptive title for the widget\n"
+        "- widget_description: (string) a comprehensive, detailed description of what the widget does and how it is useful\n"
+        "- endpoint: (string) the datasource endpoint(s) used\n"
+        "- data_combination: (string) a highly detailed, step-by-step explanation of exactly what data fields (including all relevant nested JSON fields) to fetch and combine from which endpoint(s), with clear instructions for a frontend developer. The data_combination must fetch all relevant data from the specified endpoint(s) as appropriate, and sort or organize the data so that the widget is meaningful and useful for the end user. Be explicit about how to process, filter, and sort the data for the widget's purpose.\n"
+        "- react_fetch_example: (string) a copy-paste ready React fetch code snippet (no imports, just the fetch logic and data extraction) that demonstrates exactly how to fetch and combine the data for this widget, with comments explaining each step and referencing all relevant nested fields. If the schema or sample is incomplete, make reasonable assumptions and still provide a complete, detailed example.\n"
+        "Guardrails:\n"
+        f"- Output exactly {count} ideas as a JSON array of objects.\n"
+        "- All fields must be strings. If you are unsure, use an empty string.\n"
+        "- Do NOT use values from the sample entry as the only possible values; your suggestions should be general and applicable to any data conforming to the schema.\n"
+        "- Do NOT include any explanation, commentary, or markdown—output ONLY the JSON array.\n"
+        f"- Validate your output: ensure the result is a valid JSON array of {count} objects, each with the required fields and correct types.\n"
+        f"Datasource schemas and sample entries:\n{schemas_str}\n"
+        "Respond ONLY with the JSON array."
+    )
+
+    result = invoke_llm("ideas", [HumanMessage(content=prompt)], temperature=0.3)
+
+    # Try to parse the LLM's response as JSON
+    try:
+        ideas = json.loads(result)
+        # Validate structure: ensure each idea has required fields and there are exactly count
+        if not isinstance(ideas, list) or len(ideas) != count:
+            return [{"error": f"LLM did not return exactly {count} widget ideas", "raw_response": result}]
+        validated = []
+        for idea in ideas:
+            validated.append({
+                "widget_title": idea.get("widget_title", ""),
+                "widget_description": idea.get("widget_description", ""),
+                "endpoint": idea.get("endpoint", ""),
+                "data_combination": idea.get("data_combination", "")
+            })
+        return validated
+    except Exception as e:
+        # Return error in result
+        return [{"error": f"Failed to parse LLM response as JSON: {str(e)}", "raw_response": result}]
@@ -0,0 +1,164 @@
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+
+import openai
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+
+# Routing layer for all LLM calls. Each pipeline stage maps to a tier (LLM_STAGE_TIERS),
+# each tier to an ordered list of endpoints (LLM_TIERS), and each endpoint to a model and
+# optional OpenAI-compatible base_url (LLM_ENDPOINTS). Calls go to the most preferred
+# healthy endpoint. Rate limits and transient server errors are retried there with
+# backoff (LLM_MAX_RETRIES) before failing over; timeouts, connection and other errors
+# fail over to the next endpoint immediately.
+#
+# Latency and error stats are kept per (stage, endpoint) in this process; a Celery
+# worker's threads share them, separate worker processes learn independently.
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.samples = deque(maxlen=max(1, settings.LLM_STATS_WINDOW))  # (latency, ok)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.slow_until = 0.0
+
+    def record(self, latency: float, ok: bool, budget: float | None = None) -> None:
+        # Demotions are time-bounded so a recovered endpoint gets tried again
+        self.samples.append((latency, ok))
+        now = time.monotonic()
+        if ok:
+            self.consecutive_failures = 0
+            p50 = self.p50_latency()
+            if budget is not None and latency > budget and p50 is not None and p50 > budget:
+                self.slow_until = now + settings.LLM_COOLDOWN
+            return
+        self.consecutive_failures += 1
+        # The error-rate rule needs enough samples to mean anything; otherwise the
+        # first failure on a fresh endpoint (rate 1.0) would trip it immediately
+        enough_samples = len(self.samples) >= settings.LLM_FAILURES_BEFORE_COOLDOWN
+        if (
+            self.consecutive_failures >= settings.LLM_FAILURES_BEFORE_COOLDOWN
+            or (enough_samples and self.error_rate() > settings.LLM_ERROR_RATE_THRESHOLD)
+        ):
+            self.cooldown_until = now + settings.LLM_COOLDOWN
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def p50_latency(self) -> float | None:
+        latencies = [latency for latency, ok in self.samples if ok]
+        return statistics.median(latencies) if latencies else None
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": len(self.samples),
+            "error_rate": round(self.error_rate(), 3),
+            "p50_latency": self.p50_latency(),
+            "cooling_down": self.cooldown_until > time.monotonic(),
+            "slow": self.slow_until > time.monotonic(),
+        }
+
+
+_stats: dict[tuple[str, str], _EndpointStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _stats_for(stage: str, endpoint: str) -> _EndpointStats:
+    with _stats_lock:
+        if (stage, endpoint) not in _stats:
+            _stats[(stage, endpoint)] = _EndpointStats()
+        return _stats[(stage, endpoint)]
+
+
+def llm_stats() -> dict:
+    """Snapshot of the rolling per-stage, per-endpoint stats, for logging and debugging."""
+    with _stats_lock:
+        return {f"{stage}/{endpoint}": s.snapshot() for (stage, endpoint), s in _stats.items()}
+
+
+def candidates_for(stage: str) -> list[str]:
+    """
+    Endpoints to try for a stage, best first. Configured tier order is the preference;
+    endpoints cooling down after errors (repeated failures or an error rate above
+    LLM_ERROR_RATE_THRESHOLD) are tried last, and those whose median latency exceeded the
+    stage's budget in LLM_STAGE_LATENCY_BUDGET come after the fast ones.
+    """
+    tier = settings.LLM_STAGE_TIERS.get(stage, settings.LLM_DEFAULT_TIER)
+    endpoints = [name for name in settings.LLM_TIERS.get(tier, []) if name in settings.LLM_ENDPOINTS]
+    if not endpoints:
+        raise ValueError(f"No LLM endpoints configured for stage '{stage}' (tier '{tier}')")
+
+    now = time.monotonic()
+
+    def rank(item):
+        index, name = item
+        stats = _stats_for(stage, name)
+        return (stats.cooldown_until > now, stats.slow_until > now, index)
+
+    return [name for _, name in sorted(enumerate(endpoints), key=rank)]
+
+
+def _chat_model(endpoint: str, temperature: float) -> ChatOpenAI:
+    config = settings.LLM_ENDPOINTS[endpoint]
+    return ChatOpenAI(
+        openai_api_key=config.get("api_key") or settings.OPENAI_API_KEY,
+        base_url=config.get("base_url"),
+        model=config.get("model", endpoint),
+        temperature=temperature,
+        max_tokens=config.get("max_tokens", settings.LLM_MAX_TOKENS),
+        timeout=config.get("timeout", settings.LLM_TIMEOUT),
+        # Retries are done in _invoke_endpoint so timeouts can fail over without retrying
+        max_retries=0,
+    )
+
+
+def _is_transient(error: Exception) -> bool:
+    """Rate limits and server-side errors that are worth retrying on the same endpoint."""
+    return isinstance(error, openai.APIStatusError) and (
+        error.status_code in (408, 409, 429) or error.status_code >= 500
+    )
+
+
+def _invoke_endpoint(stage: str, endpoint: str, messages: list, temperature: float):
+    for attempt in range(max(0, settings.LLM_MAX_RETRIES) + 1):
+        try:
+            return _chat_model(endpoint, temperature).invoke(messages)
+        except Exception as e:
+            if attempt >= settings.LLM_MAX_RETRIES or not _is_transient(e):
+                raise
+            delay = settings.LLM_RETRY_BACKOFF * 2 ** attempt
+            logging.warning(f"[LLMRouter] {stage} call to '{endpoint}' failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def invoke_llm(stage: str, messages: list, temperature: float = 0.2) -> str:
+    """
+    Send messages to the best endpoint for the pipeline stage ("sample", "spec", "ideas",
+    "code") and return the response text. Rate-limited and transient errors are retried on
+    the same endpoint first; after that, or on any other error, it fails over to the next
+    endpoint in the tier. Raises the last error if every endpoint fails.
+    """
+    budget = settings.LLM_STAGE_LATENCY_BUDGET.get(stage)
+    last_error = None
+    for endpoint in candidates_for(stage):
+        stats = _stats_for(stage, endpoint)
+        started = time.monotonic()
+        try:
+            result = _invoke_endpoint(stage, endpoint, messages, temperature)
+        except Exception as e:
+            with _stats_lock:
+                stats.record(time.monotonic() - started, ok=False)
+            logging.warning(f"[LLMRouter] {stage} call to '{endpoint}' failed after {time.monotonic() - started:.1f}s: {e}")
+            last_error = e
+            continue
+        with _stats_lock:
+            stats.record(time.monotonic() - started, ok=True, budget=budget)
+        return result.content if hasattr(result, "content") else str(result)
+    raise last_error
@@ -0,0 +1,10 @@
+# Registered Celery task names.
+# The API enqueues by name via celery_app.send_task so it never imports the task
+# modules (and LangChain). Names keep their original "langchain_task" prefix so
+# messages already queued by older processes still resolve.
+RUN_LANGCHAIN = "app.tasks.langchain_task.run_langchain"
+GENERATE_OPENAPI_SPEC_FROM_SCHEMAS = "app.tasks.langchain_task.generate_openapi_spec_from_schemas"
+SUGGEST_WIDGETS_FROM_OPENAPI = "app.tasks.langchain_task.suggest_widgets_from_openapi"
+SUGGEST_WIDGETS_FROM_DATASOURCE_SCHEMAS = "app.tasks.langchain_task.suggest_widgets_from_datasource_schemas"
+SUGGEST_WIDGETS_FROM_SCHEMAS = "app.tasks.langchain_task.suggest_widgets_from_schemas"
+GENERATE_WIDGETS_FROM_IDEAS = "app.tasks.langchain_task.generate_widgets_from_ideas"
@@ -0,0 +1,69 @@
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.blob_store import put_json_blob
+from app.tasks.names import GENERATE_OPENAPI_SPEC_FROM_SCHEMAS
+from app.tasks.llm_router import invoke_llm
+from langchain_core.messages import HumanMessage
+import json
+from app.api.extract_api_schemas import extract_schemas_from_api
+
+# Celery task to generate OpenAPI 3.1.1 spec from discovered schemas
+@celery_app.task(name=GENERATE_OPENAPI_SPEC_FROM_SCHEMAS)
+def generate_openapi_spec_from_schemas() -> dict:
+    """
+    Always generate and overwrite openapi-schema.json with a new OpenAPI 3.1.1 specification.
+    Returns a dict with type: "openapi" and schema_ref: (content hash of the stored OpenAPI 3.1.1 spec).
+    """
+    schema_path = "openapi-schema.json"
+
+    endpoints = settings.DATASOURCES_API_ENDPOINTS
+    schemas = {}
+
+    # Fetch schemas synchronously using the helper
+    for url in endpoints:
+        try:
+            schemas.update(extract_schemas_from_api(url))
+        except Exception as e:
+            schemas[url] = {"error": str(e)}
+
+    schemas_str = json.dumps(schemas, indent=2)
+    # OpenAPI 3.1.1 documentation context (shortened for prompt size)
+    # Determine which endpoints require Authorization from DATASOURCE_AUTH_HEADERS
+    auth_endpoints = [
+        url for url, headers in getattr(settings, "DATASOURCE_AUTH_HEADERS", {}).items()
+        if "Authorization" in headers and headers["Authorization"].startswith("Bearer ")
+    ]
+    openapi_context = (
+        "You are an expert API designer. Given the following discovered API endpoints and their JSON schemas, "
+        "generate a complete, valid OpenAPI 3.1.1 specification (in JSON, not YAML) that describes these endpoints. "
+        "Follow the OpenAPI 3.1.1 specification strictly. "
+        "Include all required fields: openapi, info, servers, paths, components, etc. "
+        "For the 'servers' field, use the following actual endpoint URLs (do NOT use example.com or placeholders):\n"
+        f"{json.dumps([{'url': url} for url in endpoints], indent=2)}\n"
+        "Use the schemas as the basis for the components/schemas section. "
+        "For each endpoint, infer the HTTP method (GET if unknown), and create a path with a response schema. "
+        "If you are unsure about details, make reasonable assumptions. "
+        f"IMPORTANT: The following endpoints require an Authorization header with a Bearer token and must have security: [{{bearerAuth: []}}]:\n{json.dumps(auth_endpoints, indent=2)}\n"
+        "You MUST include a securitySchemes section in components with a bearerAuth scheme (type: http, scheme: bearer, bearerFormat: JWT). "
+        "You MUST add a security: [ { bearerAuth: [] } ] requirement ONLY to the paths/operations for the endpoints listed above. "
+        "Do NOT add security to endpoints not listed above. "
+        "Output ONLY the OpenAPI JSON object, no explanation or markdown.\n"
+        f"Discovered schemas:\n{schemas_str}\n"
+        "Respond ONLY with the OpenAPI 3.1.1 JSON object."
+    )
+
+    result = invoke_llm("spec", [HumanMessage(content=openapi_context)], temperature=0.2)
+
+    # Try to parse the LLM's response as JSON
+    try:
+        openapi_spec = json.loads(result)
+        # Overwrite the "servers" field with the actual endpoints
+        openapi_spec["servers"] = [{"url": url} for url in endpoints]
+        # Save OpenAPI spec to file
+        with open(schema_path, "w") as f:
+            json.dump(openapi_spec, f, indent=2)
+        print(f"✅ OpenAPI spec saved to {schema_path}")
+        # Store the spec by reference; the result endpoint resolves it on demand.
+        return {"type": "openapi", "schema_ref": put_json_blob(openapi_spec)}
+    except Exception as e:
+        return {"error": f"Failed to parse LLM response as JSON: {str(e)}", "raw_response": result}
@@ -0,0 +1,101 @@
+import functools
+import hashlib
+import logging
+import subprocess
+import threading
+
+import redis
+
+from app.core.blob_store import get_text_blob, put_text_blob
+from app.core.config import settings
+
+# Bound the number of esbuild subprocesses running at once across all
+# generate_code threads in this worker.
+_compiler_slots = threading.BoundedSemaphore(max(1, settings.WIDGET_COMPILER_CONCURRENCY))
+
+_COMPILER_FLAGS = ["--loader=tsx", "--format=cjs", "--target=es2019", "--log-level=error"]
+
+
+class WidgetCompileError(Exception):
+    """Raised when generated widget code fails to parse or transpile."""
+
+
+@functools.lru_cache(maxsize=1)
+def _compiler_version() -> str:
+    try:
+        proc = subprocess.run(
+            [settings.WIDGET_COMPILER_BIN, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=settings.WIDGET_COMPILER_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return "unavailable"
+    return proc.stdout.strip() or "unknown"
+
+
+def code_hash(code: str) -> str:
+    """
+    Return the content hash used to key compiled widget artifacts. It covers the compiler
+    version and flags as well as the code, so output from an older build is never reused.
+    """
+    identity = "\0".join([_compiler_version(), *_COMPILER_FLAGS, code])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def _read_cached(digest: str) -> str | None:
+    try:
+        return get_text_blob(digest)
+    except redis.RedisError as e:
+        logging.warning(f"[WidgetCompiler] Could not read compiled widget {digest}: {e}")
+        return None
+
+
+def _write_cached(digest: str, compiled: str) -> bool:
+    try:
+        put_text_blob(digest, compiled)
+    except redis.RedisError as e:
+        logging.warning(f"[WidgetCompiler] Could not store compiled widget {digest}: {e}")
+        return False
+    return True
+
+
+def compile_widget_code(code: str) -> tuple[str, bool]:
+    """
+    Syntax-check and transpile widget code with esbuild, the same way the browser's
+    BabelTranspiler would (TSX/JSX in, CommonJS-style script out). The compiled JS is
+    stored in the blob store under its code_hash, where the API serves it from.
+    Returns (code_hash, compiled). compiled is False when no compiler is available, it timed
+    out or the output could not be stored, so callers fall back to client-side transpilation.
+    Raises WidgetCompileError when the code is invalid.
+    """
+    digest = code_hash(code)
+    if _read_cached(digest) is not None:
+        return digest, True
+
+    with _compiler_slots:
+        try:
+            proc = subprocess.run(
+                [settings.WIDGET_COMPILER_BIN, *_COMPILER_FLAGS],
+                input=code,
+                capture_output=True,
+                text=True,
+                timeout=settings.WIDGET_COMPILER_TIMEOUT,
+            )
+        except FileNotFoundError:
+            logging.warning(
+                f"[WidgetCompiler] '{settings.WIDGET_COMPILER_BIN}' not found; skipping server-side transpilation"
+            )
+            return digest, False
+        except subprocess.TimeoutExpired:
+            # A stuck compiler says nothing about the code; don't trigger a regeneration
+            logging.warning(
+                f"[WidgetCompiler] esbuild timed out after {settings.WIDGET_COMPILER_TIMEOUT}s; "
+                "skipping server-side transpilation"
+            )
+            return digest, False
+
+    if proc.returncode != 0:
+        raise WidgetCompileError(proc.stderr.strip() or f"esbuild exited with status {proc.returncode}")
+
+    return digest, _write_cached(digest, proc.stdout)
@@ -0,0 +1,117 @@
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.blob_store import get_json_blob
+from app.tasks.names import GENERATE_WIDGETS_FROM_IDEAS
+from app.tasks.idea_task import widget_ideas_from_openapi, suggest_widgets_from_datasource_schemas
+import json
+
+# Celery task to generate React widget code for each widget idea
+@celery_app.task(name=GENERATE_WIDGETS_FROM_IDEAS)
+def generate_widgets_from_ideas(schema_ref: str | None = None) -> list:
+    """
+    Generate React widget code for each widget idea using the widget-generation-prompt.tmpl.
+    schema_ref points at an OpenAPI spec in app.core.blob_store; without one the spec is
+    loaded from openapi-schema.json or generated from the datasources.
+    Each widget is syntax-checked and pre-transpiled server-side; code that fails to compile
+    is regenerated up to WIDGET_CODE_MAX_ATTEMPTS times.
+    Returns a list of dicts: {widget_title, widget_description, code, code_hash, compiled, compile_error}.
+    When compiled is true the transpiled JS is served from /api/generate-widgets/compiled/{code_hash}.
+    """
+    import os
+    from app.tasks.llm_router import invoke_llm
+    from langchain_core.messages import HumanMessage, AIMessage
+    from app.tasks.widget_compiler import compile_widget_code, code_hash, WidgetCompileError
+
+    # 1. Get widget ideas and OpenAPI spec
+    if schema_ref:
+        openapi_spec = get_json_blob(schema_ref)
+        widget_ideas = widget_ideas_from_openapi(openapi_spec) if openapi_spec else None
+    else:
+        schema_path = "openapi-schema.json"
+        if os.path.exists(schema_path):
+            with open(schema_path, "r") as f:
+                openapi_spec = json.load(f)
+            widget_ideas = widget_ideas_from_openapi(openapi_spec)
+        else:
+            result = suggest_widgets_from_datasource_schemas()
+            openapi_spec = get_json_blob(result.get("schema_ref"))
+            widget_ideas = result.get("response")
+
+    if not widget_ideas or not openapi_spec:
+        return []
+
+    # 2. Load prompt template
+    tmpl_path = os.path.join(os.path.dirname(__file__), "../prompts/widget-generation-prompt.tmpl")
+    with open(tmpl_path, "r") as f:
+        prompt_template = f.read()
+
+    # 3. For each widget idea, generate code
+    import concurrent.futures
+    import logging
+
+    def generate_code(idea):
+        description = idea.get("widget_description", "")
+        endpoint = idea.get("endpoint", "")
+        # Find the matching headers for the endpoint, if any
+        matched_headers = None
+        for url, headers in getattr(settings, "DATASOURCE_AUTH_HEADERS", {}).items():
+            if endpoint.startswith(url):
+                matched_headers = headers
+                break
+        openapi_schema_str = json.dumps(openapi_spec, indent=2)
+        prompt = (
+            prompt_template
+            .replace('""" + description + """', description)
+            .replace("OPENAPI_SCHEMA_PLACEHOLDER", openapi_schema_str)
+        )
+        # Syntax-check and pre-transpile server-side; regenerate broken output
+        # so invalid widgets never reach the dashboard.
+        messages = [HumanMessage(content=prompt)]
+        compiled = False
+        compile_error = None
+        digest = None
+        for attempt in range(max(1, settings.WIDGET_CODE_MAX_ATTEMPTS)):
+            code = invoke_llm("code", messages, temperature=0.2)
+            try:
+                digest, compiled = compile_widget_code(code)
+                compile_error = None
+                break
+            except WidgetCompileError as e:
+                compile_error = str(e)
+                digest = code_hash(code)
+                logging.warning(
+                    f"[WidgetGen] Attempt {attempt + 1} for '{idea.get('widget_title', '')}' failed to compile:\n{compile_error}"
+                )
+                messages = [
+                    HumanMessage(content=prompt),
+                    AIMessage(content=code),
+                    HumanMessage(content=(
+                        "The code above failed to compile with the following error:\n"
+                        f"{compile_error}\n"
+                        "Output the complete corrected code only, following all the original instructions."
+                    )),
+                ]
+        # No header injection or replacement; rely on prompt to enforce correct header usage
+        logging.warning(
+            f"[WidgetGen] Widget Title: {idea.get('widget_title', '')}\n"
+            f"Description: {description}\n"
+            f"Code (full):\n{code}\n"
+            f"Code length: {len(code)}"
+        )
+        print("\n===== FINAL WIDGET CODE WITH INJECTED HEADERS =====\n")
+        print(code)
+        print("\n===== END FINAL WIDGET CODE =====\n")
+        return {
+            "widget_title": idea.get("widget_title", ""),
+            "widget_description": description,
+            "code": code,
+            "code_hash": digest,
+            "compiled": compiled,
+            "compile_error": compile_error
+        }
+
+    # Bounded so one job cannot fan out unbounded concurrent LLM calls
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, settings.WIDGET_CODEGEN_CONCURRENCY)) as executor:
+        results = list(executor.map(generate_code, widget_ideas))
+
+    return results
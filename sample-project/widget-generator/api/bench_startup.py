@@ -0,0 +1,77 @@
+"""
+Import-time benchmark for the API process and each Celery worker profile.
+
+Each target is imported in a fresh interpreter so results reflect a cold start.
+Reports wall-clock import time, peak RSS and whether LangChain got loaded.
+
+Usage: python bench_startup.py [--runs N]
+"""
+import json
+import os
+import subprocess
+import sys
+
+# Settings requires an API key; the benchmark never calls the LLM.
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.core.celery_app import WORKER_PROFILES
+
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "langchain": "langchain_openai" in sys.modules,
+}}))
+"""
+
+
+def _targets():
+    targets = {"api": "import main"}
+    for profile, config in WORKER_PROFILES.items():
+        lines = [
+            "from app.core.celery_app import celery_app, configure_worker_profile",
+            f"configure_worker_profile({profile!r})",
+            "celery_app.loader.import_default_modules()",
+        ]
+        targets[f"worker:{profile}"] = "\n".join(lines)
+    return targets
+
+
+def _measure(imports: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(imports=imports)],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = 5
+    if "--runs" in sys.argv:
+        runs = int(sys.argv[sys.argv.index("--runs") + 1])
+
+    print(f"{'target':<16} {'import (s)':>12} {'peak RSS (MB)':>14}  langchain")
+    for name, imports in _targets().items():
+        try:
+            samples = [_measure(imports) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"{name:<16} failed: {e.splitlines()[-1]}")
+            continue
+        seconds = sorted(s["seconds"] for s in samples)[len(samples) // 2]
+        rss = max(s["rss_mb"] for s in samples)
+        print(f"{name:<16} {seconds:>12.3f} {rss:>14.1f}  {'yes' if samples[0]['langchain'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Check that task results are stored compressed in the result backend.
+
+Stores a widget-sized result through the configured Celery backend, reads the raw value
+back from Redis and verifies that it is not plain JSON, is smaller than the JSON encoding
+and still round-trips through AsyncResult. Exits 1 if any of that does not hold.
+
+Usage: python check_result_compression.py
+"""
+import json
+import os
+import sys
+import uuid
+
+# Settings requires an API key; the check never calls the LLM.
+os.environ.setdefault("OPENAI_API_KEY", "check")
+
+from celery.result import AsyncResult
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+
+SAMPLE_RESULT = [
+    {
+        "widget_title": f"Widget {i}",
+        "widget_description": "A sample widget used to check result compression.",
+        "code": "const WidgetComponent = () => React.createElement('div', null, 'Hello');\n" * 200,
+        "code_hash": uuid.uuid4().hex,
+        "compile_error": None,
+    }
+    for i in range(3)
+]
+
+
+def main():
+    backend = celery_app.backend
+    task_id = f"compression-check-{uuid.uuid4()}"
+    backend.store_result(task_id, SAMPLE_RESULT, "SUCCESS")
+    try:
+        raw = backend.client.get(backend.get_key_for_task(task_id))
+        plain = len(json.dumps({"status": "SUCCESS", "result": SAMPLE_RESULT}).encode("utf-8"))
+        print(f"result_serializer={celery_app.conf.result_serializer} stored={len(raw)} bytes plain_json={plain} bytes")
+
+        failures = []
+        if raw.lstrip().startswith(b"{"):
+            failures.append("stored value is plain JSON")
+        if len(raw) >= plain:
+            failures.append("stored value is not smaller than its JSON encoding")
+        if AsyncResult(task_id, app=celery_app).result != SAMPLE_RESULT:
+            failures.append("stored value does not round-trip")
+    finally:
+        backend.forget(task_id)
+
+    if settings.CELERY_RESULT_COMPRESSION and failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK" if settings.CELERY_RESULT_COMPRESSION else "OK (CELERY_RESULT_COMPRESSION is disabled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Local OpenAI-compatible stand-in for the LLM, for testing the pipeline without API keys.
+
+It implements POST /v1/chat/completions and returns canned but well-formed answers for
+each pipeline stage (OpenAPI spec, widget ideas, widget code), with optional simulated
+latency and error rate.
+
+Usage:
+    python fake_llm_server.py --port 8001 --latency 0.5 --error-rate 0.05
+
+Then point an endpoint at it, e.g. in .env:
+    LLM_ENDPOINTS={"local": {"model": "fake", "base_url": "http://localhost:8001/v1", "api_key": "local"}}
+    LLM_TIERS={"strong": ["local"], "fast": ["local"]}
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake LLM")
+app.state.latency = 0.0
+app.state.error_rate = 0.0
+
+SAMPLE_WIDGET_CODE = """const WidgetComponent = ({ headersMap, darkMode }) => {
+  const { useState } = React;
+  const [count] = useState(0);
+  return React.createElement("div", { style: { color: darkMode ? "#fff" : "#344054" } },
+    React.createElement("div", { style: { height: 48, display: "flex", alignItems: "center", justifyContent: "center", fontSize: 16, fontWeight: 600 } }, "Fake Widget"),
+    React.createElement("div", null, "Count: " + count)
+  );
+};
+
+exports.WidgetComponent = WidgetComponent;
+"""
+
+
+def _answer(prompt: str) -> str:
+    if "OpenAPI 3.1.1 JSON object" in prompt:
+        return json.dumps({
+            "openapi": "3.1.1",
+            "info": {"title": "Fake API", "version": "1.0.0"},
+            "servers": [],
+            "paths": {"/items/": {"get": {"responses": {"200": {"description": "OK"}}}}},
+            "components": {"schemas": {}},
+        })
+    match = re.search(r"Output exactly (\d+) ideas", prompt)
+    if match:
+        count = int(match.group(1))
+        return json.dumps([
+            {
+                "widget_title": f"Fake Widget {i + 1}",
+                "widget_description": "A widget generated by the fake LLM server.",
+                "endpoint": "/items/",
+                "data_combination": "Fetch /items/ and list them.",
+                "react_fetch_example": "",
+            }
+            for i in range(count)
+        ])
+    if "React code widget" in prompt:
+        return SAMPLE_WIDGET_CODE
+    return "42"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    if app.state.latency:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * app.state.latency)
+    if random.random() < app.state.error_rate:
+        return JSONResponse(status_code=503, content={"error": {"message": "Simulated upstream error", "type": "server_error"}})
+
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+    content = _answer(prompt)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4},
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean simulated latency per call, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that return HTTP 503")
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    app.state.error_rate = args.error_rate
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.core.admission import AdmissionRejected
+from app.core.config import settings
 from app.api.langchain import router as langchain_router
 from app.api.datasource import router as datasource_router
 from app.api.generate_widget_ideas import router as widget_ideas_router
@@ -13,6 +16,20 @@ app.include_router(langchain_router, prefix="/api")
 app.include_router(datasource_router, prefix="/api")
 app.include_router(widget_ideas_router, prefix="/api")
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(getattr(exc, "retry_after", settings.RETRY_AFTER_DEFAULT))},
+        content={
+            "error": str(exc),
+            "scope": exc.scope,
+            "in_flight": exc.in_flight,
+            "limit": exc.limit,
+            "queue_position": exc.queue_position,
+        },
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=3001, reload=True)
@@ -1,12 +1,15 @@
-from app.core.celery_app import celery_app
+import sys
+from app.core.celery_app import celery_app, configure_worker_profile
+from app.core.config import settings
 
 def main():
-    from celery.bin import worker as celery_worker_bin
-    # Set the default app for the worker
+    # Usage: python run_celery.py [all|default|spec|ideas|widgets]
+    profile = sys.argv[1] if len(sys.argv) > 1 else settings.CELERY_WORKER_PROFILE
+    queues = configure_worker_profile(profile)
     celery_app.worker_main([
         "worker",
         "--loglevel=INFO",
-        "--queues=default"
+        f"--queues={','.join(queues)}"
     ])
 
 if __name__ == "__main__":
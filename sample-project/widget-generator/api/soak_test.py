@@ -0,0 +1,244 @@
+"""
+Soak test for the widget generation pipeline.
+
+Drives sustained POST /api/generate-widgets load from several tenants, long-polls each
+accepted job to completion, and periodically samples Celery queue depths and worker
+memory. At the end it reports queue growth, memory growth per worker and whether
+end-to-end latency stayed bounded (exit code 1 if it did not).
+
+Run it against a fake LLM so the load costs nothing, e.g.:
+
+    python fake_llm_server.py --port 8001 --latency 2
+    LLM_ENDPOINTS='{"local": {"model": "fake", "base_url": "http://localhost:8001/v1", "api_key": "local"}}' \\
+    LLM_TIERS='{"strong": ["local"], "fast": ["local"]}' python run_celery.py
+    python main.py
+    python soak_test.py --duration 600 --rate 0.5 --tenants 4
+
+(--start-fake-llm starts the fake LLM server as a subprocess for convenience.)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+os.environ.setdefault("OPENAI_API_KEY", "soak")
+
+from app.core.admission import queue_depth
+from app.core.celery_app import celery_app
+
+
+class SoakStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = 0
+        self.completed = []  # (finished_at, latency, status)
+
+    def add(self, field: str) -> None:
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def complete(self, latency: float, status: str) -> None:
+        with self.lock:
+            self.completed.append((time.monotonic(), latency, status))
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _queues():
+    return sorted({route["queue"] for route in celery_app.conf.task_routes.values()})
+
+
+def _process_rss_mb(pid: int) -> float | None:
+    """Current RSS of a local process from /proc, or None if it is not visible here."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _worker_rss_mb() -> dict:
+    """
+    Current RSS of every worker process, keyed "worker/pid". Tasks run in the prefork pool
+    children, so the pool PIDs reported by `celery inspect stats` are sampled along with
+    the main process. Workers must run on this host for /proc to see them.
+    """
+    stats = celery_app.control.inspect(timeout=2).stats() or {}
+    rss = {}
+    for name, info in stats.items():
+        pids = [info.get("pid")] + list(info.get("pool", {}).get("processes", []))
+        for pid in pids:
+            if pid is None:
+                continue
+            mb = _process_rss_mb(pid)
+            if mb is not None:
+                rss[f"{name}/{pid}"] = mb
+    return rss
+
+
+def _run_job(args, stats: SoakStats, tenant: str):
+    started = time.monotonic()
+    stats.add("submitted")
+    try:
+        resp = requests.post(
+            f"{args.api}/api/generate-widgets",
+            json={},
+            headers={"X-Tenant-ID": tenant},
+            timeout=30,
+        )
+    except requests.RequestException:
+        stats.add("errors")
+        return
+    if resp.status_code == 429:
+        stats.add("rejected")
+        return
+    if resp.status_code != 200:
+        stats.add("errors")
+        return
+    stats.add("accepted")
+
+    task_id = resp.json()["task_id"]
+    while time.monotonic() - started < args.job_timeout:
+        try:
+            result = requests.get(
+                f"{args.api}/api/generate-widgets/result/{task_id}",
+                params={"wait": args.wait},
+                timeout=args.wait + 10,
+            ).json()
+        except (requests.RequestException, ValueError):
+            time.sleep(1)
+            continue
+        if result.get("status") in ("SUCCESS", "FAILURE", "REVOKED"):
+            stats.complete(time.monotonic() - started, result["status"])
+            return
+    stats.complete(time.monotonic() - started, "TIMEOUT")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default="http://localhost:3001")
+    parser.add_argument("--duration", type=float, default=300, help="Seconds of sustained load")
+    parser.add_argument("--rate", type=float, default=1.0, help="Jobs submitted per second")
+    parser.add_argument("--tenants", type=int, default=4)
+    parser.add_argument("--wait", type=float, default=30, help="Long-poll seconds per result request")
+    parser.add_argument("--job-timeout", type=float, default=900)
+    parser.add_argument("--sample-interval", type=float, default=10)
+    parser.add_argument("--latency-growth-limit", type=float, default=2.0,
+                        help="Max allowed ratio of p95 latency in the last third of the run vs the first third")
+    parser.add_argument("--start-fake-llm", type=int, metavar="PORT",
+                        help="Start fake_llm_server.py on PORT for the duration of the run")
+    parser.add_argument("--fake-llm-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    fake_llm = None
+    if args.start_fake_llm:
+        fake_llm = subprocess.Popen([
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_llm_server.py"),
+            "--port", str(args.start_fake_llm), "--latency", str(args.fake_llm_latency),
+        ])
+
+    stats = SoakStats()
+    samples = []
+    start = time.monotonic()
+    stop = threading.Event()
+
+    def sample():
+        while True:
+            try:
+                depths = {queue: queue_depth(queue) for queue in _queues()}
+            except Exception:
+                depths = {}
+            try:
+                rss = _worker_rss_mb()
+            except Exception:
+                rss = {}
+            with stats.lock:
+                snapshot = (stats.submitted, stats.accepted, stats.rejected, len(stats.completed))
+            samples.append({"t": time.monotonic() - start, "depths": depths, "rss_mb": rss, "counts": snapshot})
+            print(
+                f"[{samples[-1]['t']:7.1f}s] submitted={snapshot[0]} accepted={snapshot[1]} "
+                f"rejected={snapshot[2]} completed={snapshot[3]} queues={json.dumps(depths)} "
+                f"process_rss_mb={json.dumps({k: round(v, 1) for k, v in rss.items()})}",
+                flush=True,
+            )
+            if stop.wait(args.sample_interval):
+                return
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=512) as executor:
+            i = 0
+            while time.monotonic() - start < args.duration:
+                executor.submit(_run_job, args, stats, f"soak-tenant-{i % args.tenants}")
+                i += 1
+                time.sleep(1 / args.rate)
+            print("Load phase finished; waiting for in-flight jobs...", flush=True)
+    finally:
+        stop.set()
+        sampler.join()
+        if fake_llm:
+            fake_llm.terminate()
+
+    # Report
+    completed = stats.completed
+    latencies = [latency for _, latency, _ in completed]
+    print("\n===== SOAK TEST REPORT =====")
+    print(f"duration={args.duration:.0f}s rate={args.rate}/s tenants={args.tenants}")
+    print(f"submitted={stats.submitted} accepted={stats.accepted} rejected(429)={stats.rejected} errors={stats.errors}")
+    statuses = {}
+    for _, _, status in completed:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"completed={len(completed)} by status={statuses}")
+    if latencies:
+        print(f"latency p50={_percentile(latencies, 50):.1f}s p95={_percentile(latencies, 95):.1f}s max={max(latencies):.1f}s")
+
+    if len(samples) >= 2:
+        first, last = samples[0], samples[-1]
+        for queue in sorted(set(first["depths"]) | set(last["depths"])):
+            print(f"queue '{queue}': depth {first['depths'].get(queue, 0)} -> {last['depths'].get(queue, 0)}")
+        # Compare each process's first and last sample; pool children may be
+        # replaced during the run (e.g. worker_max_tasks_per_child)
+        first_seen, last_seen = {}, {}
+        for snapshot in samples:
+            for process, mb in snapshot["rss_mb"].items():
+                first_seen.setdefault(process, (snapshot["t"], mb))
+                last_seen[process] = (snapshot["t"], mb)
+        if not first_seen:
+            print("worker memory: no worker processes visible via /proc (run the soak test on the worker host)")
+        for process in sorted(first_seen):
+            (t0, before), (t1, after) = first_seen[process], last_seen[process]
+            print(f"process {process}: RSS {before:.1f} -> {after:.1f} MB ({after - before:+.1f} MB over {t1 - t0:.0f}s)")
+
+    bounded = True
+    if completed:
+        finished = sorted(completed)
+        third = max(1, len(finished) // 3)
+        early = _percentile([latency for _, latency, _ in finished[:third]], 95)
+        late = _percentile([latency for _, latency, _ in finished[-third:]], 95)
+        bounded = late <= early * args.latency_growth_limit
+        print(f"p95 latency first third={early:.1f}s last third={late:.1f}s -> {'bounded' if bounded else 'UNBOUNDED'}")
+    if not bounded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
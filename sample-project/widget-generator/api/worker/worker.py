@@ -1,4 +1,10 @@
-from app.core.celery_app import celery_app
+from app.core.celery_app import celery_app, configure_worker_profile
+from app.core.config import settings
+
+# Only load the task modules needed by CELERY_WORKER_PROFILE, and consume only its queues
+# (the same as run_celery.py's --queues), not Celery's default "celery" queue
+queues = configure_worker_profile(settings.CELERY_WORKER_PROFILE)
+celery_app.select_queues(queues)
 
 if __name__ == "__main__":
     celery_app.start()
@@ -1,7 +1,7 @@
 import { Box, Button, CircularProgress, Alert } from "@mui/material";
 import AIWidget from "./components/AIWidget/AIWidget";
 import React from "react";
-import { useGenerateWidgets } from "./hooks/queries/useGenerateWidgets";
+import { useGenerateWidgets, type GeneratedWidget } from "./hooks/queries/useGenerateWidgets";
 
 export default function AIWidgetDashboard() {
   const {
@@ -76,14 +76,28 @@ export default function AIWidgetDashboard() {
         </Box>
       )}
       {result &&
-        result.map((widget: { code: string }, idx: number) => (
-          <AIWidget
-            key={idx}
-            widgetCode={widget.code}
-            componentName="WidgetComponent"
-            darkMode={darkMode}
-          />
-        ))}
+        result.map((widget: GeneratedWidget, idx: number) =>
+          // The server could not produce compilable code after all retries;
+          // show why instead of running it in the browser
+          widget.compile_error ? (
+            <Alert
+              key={idx}
+              severity="error"
+              sx={{ width: "100%", maxWidth: 600, textAlign: "left", overflow: "auto" }}
+            >
+              <strong>{widget.widget_title || "Widget"} failed to compile.</strong>
+              <pre style={{ whiteSpace: "pre-wrap", fontSize: 12, margin: "8px 0 0" }}>{widget.compile_error}</pre>
+            </Alert>
+          ) : (
+            <AIWidget
+              key={idx}
+              widgetCode={widget.code}
+              compiledCodeHash={widget.compiled ? widget.code_hash : null}
+              componentName="WidgetComponent"
+              darkMode={darkMode}
+            />
+          )
+        )}
     </Box>
   );
 }
@@ -1,13 +1,17 @@
-import { Box } from "@mui/material";
+import { Box, CircularProgress } from "@mui/material";
 import { BabelTranspiler } from "../BabelTranspiler/BabelTranspiler";
+import { useCompiledWidget } from "../../hooks/queries/useCompiledWidget";
 
 type AIWidgetProps = {
   widgetCode: string;
+  compiledCodeHash?: string | null;
   componentName: string;
   darkMode?: boolean;
 };
 
-const AIWidget = ({ widgetCode, componentName, darkMode }: AIWidgetProps) => {
+const AIWidget = ({ widgetCode, compiledCodeHash, componentName, darkMode }: AIWidgetProps) => {
+  const compiled = useCompiledWidget(compiledCodeHash);
+
   // Load headersMap from .env (Vite)
   let headersMap = {};
   try {
@@ -40,7 +44,17 @@ const AIWidget = ({ widgetCode, componentName, darkMode }: AIWidgetProps) => {
         transition: "background 0.2s, border 0.2s"
       }}
     >
-      <BabelTranspiler code={widgetCode} componentName={componentName} headersMap={headersMap} darkMode={darkMode} />
+      {compiled.isLoading ? (
+        <CircularProgress size={32} color="secondary" />
+      ) : (
+        <BabelTranspiler
+          code={widgetCode}
+          compiledCode={compiled.data ?? undefined}
+          componentName={componentName}
+          headersMap={headersMap}
+          darkMode={darkMode}
+        />
+      )}
     </Box>
   );
 };
@@ -3,6 +3,7 @@ import * as Babel from "@babel/standalone";
 
 type BabelTranspilerProps = {
   code: string;
+  compiledCode?: string;
   componentName?: string;
   headersMap?: object;
   darkMode?: boolean;
@@ -10,6 +11,7 @@ type BabelTranspilerProps = {
 
 export const BabelTranspiler: React.FC<BabelTranspilerProps> = ({
   code,
+  compiledCode,
   componentName = "WidgetComponent",
   headersMap,
   darkMode,
@@ -22,13 +24,14 @@ export const BabelTranspiler: React.FC<BabelTranspilerProps> = ({
 
   const TranspiledComponent = useMemo(() => {
     try {
-      // Transpile the code from TSX/JSX to JS
-      const transpiled = Babel.transform(code, {
+      // Use the server's pre-transpiled output when available, otherwise
+      // transpile the code from TSX/JSX to JS in the browser
+      const transpiled = compiledCode ?? Babel.transform(code, {
         presets: ["react", "typescript"],
         filename: "widget.tsx",
       }).code;
       // eslint-disable-next-line no-console
-      console.log("[BabelTranspiler] Transpiled code:\n", transpiled);
+      if (!compiledCode) console.log("[BabelTranspiler] Transpiled code:\n", transpiled);
 
       // eslint-disable-next-line no-new-func
       const exports = {};
@@ -55,7 +58,7 @@ export const BabelTranspiler: React.FC<BabelTranspilerProps> = ({
       });
       return null;
     }
-  }, [code, componentName]);
+  }, [code, compiledCode, componentName]);
 
   const [showDetails, setShowDetails] = useState(false);
 
@@ -0,0 +1,22 @@
+import { useQuery } from "@tanstack/react-query";
+
+// Server-side transpiled JS for a generated widget, keyed by its code_hash.
+// Resolves to null when it is not stored (e.g. expired) so the caller falls back to Babel.
+const fetchCompiledWidget = async (codeHash: string): Promise<string | null> => {
+  const resp = await fetch(`/api/generate-widgets/compiled/${codeHash}`);
+  if (resp.status === 404) return null;
+  if (!resp.ok) throw new Error("Failed to fetch compiled widget");
+  return resp.text();
+};
+
+export function useCompiledWidget(codeHash?: string | null) {
+  return useQuery<string | null>({
+    queryKey: ["compiled-widget", codeHash],
+    queryFn: () => fetchCompiledWidget(codeHash!),
+    enabled: !!codeHash,
+    // Content-addressed, so it never changes
+    staleTime: Infinity,
+    retry: false,
+    refetchOnWindowFocus: false,
+  });
+}
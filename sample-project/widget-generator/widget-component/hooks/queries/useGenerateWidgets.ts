@@ -4,11 +4,16 @@ export type GeneratedWidget = {
   widget_title: string;
   widget_description: string;
   code: string;
+  code_hash?: string | null;
+  // Pre-transpiled by the worker and served by code_hash; when true the client skips Babel.
+  compiled?: boolean;
+  compile_error?: string | null;
 };
 
 type GenerateWidgetsResponse = {
   task_id: string;
   status: string;
+  queue_position?: number;
 };
 
 type GenerateWidgetsResultResponse = {
@@ -23,12 +28,24 @@ const startGenerateWidgets = async (): Promise<GenerateWidgetsResponse> => {
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({}),
   });
+  if (resp.status === 429) {
+    // Admission control: too many jobs in flight for this tenant or globally
+    const body = await resp.json().catch(() => ({}));
+    const retryAfter = resp.headers.get("Retry-After");
+    throw new Error(
+      `Widget generation is busy (${body.queue_position ?? "?"} job(s) ahead)` +
+        (retryAfter ? `, try again in ${retryAfter}s` : "")
+    );
+  }
   if (!resp.ok) throw new Error("Failed to start widget generation");
   return resp.json();
 };
 
+// Seconds the server may hold each poll open waiting for the task state to change
+const LONG_POLL_WAIT = 30;
+
 const fetchGenerateWidgetsResult = async (task_id: string): Promise<GenerateWidgetsResultResponse> => {
-  const resp = await fetch(`/api/generate-widgets/result/${task_id}`);
+  const resp = await fetch(`/api/generate-widgets/result/${task_id}?wait=${LONG_POLL_WAIT}`);
   if (!resp.ok) throw new Error("Failed to poll widget generation result");
   return resp.json();
 };
@@ -48,9 +65,10 @@ export function useGenerateWidgets() {
     enabled: !!mutation.data?.task_id,
     refetchInterval: (query) => {
       const data = query.state.data as GenerateWidgetsResultResponse | undefined;
-      // Poll as long as status is not SUCCESS or FAILURE
+      // Poll as long as status is not SUCCESS or FAILURE; each request long-polls
+      // server-side, so re-issue it almost immediately
       if (!data || (data.status !== "SUCCESS" && data.status !== "FAILURE")) {
-        return 10000; // poll every 10 seconds
+        return 500;
       }
       return false;
     },